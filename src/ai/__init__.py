@@ -2,6 +2,7 @@
 AI module
 """
 
+from .rate_limiter import RateLimiter
 from .scorer import AIScorer
 
-__all__ = ["AIScorer"]
\ No newline at end of file
+__all__ = ["AIScorer", "RateLimiter"]
\ No newline at end of file
@@ -0,0 +1,55 @@
+"""
+Token-bucket rate limiter for API requests
+"""
+
+import asyncio
+import time
+
+
+class RateLimiter:
+    """Proactive requests/min and tokens/min limiter shared across tasks"""
+
+    def __init__(self, rpm: float, tpm: float):
+        self.max_requests_per_minute = float(rpm)
+        self.max_tokens_per_minute = float(tpm)
+
+        # Buckets start full and refill continuously
+        self.available_request_capacity = self.max_requests_per_minute
+        self.available_token_capacity = self.max_tokens_per_minute
+
+        self._last_update = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        """Refill both buckets for the time elapsed since the last tick"""
+        now = time.monotonic()
+        elapsed = now - self._last_update
+        self._last_update = now
+
+        self.available_request_capacity = min(
+            self.available_request_capacity + self.max_requests_per_minute * elapsed / 60.0,
+            self.max_requests_per_minute
+        )
+        self.available_token_capacity = min(
+            self.available_token_capacity + self.max_tokens_per_minute * elapsed / 60.0,
+            self.max_tokens_per_minute
+        )
+
+    async def acquire(self, estimated_tokens: int = 0):
+        """Wait until one request and ``estimated_tokens`` tokens are available"""
+        # A single request can never need more than a full bucket
+        tokens = min(float(estimated_tokens), self.max_tokens_per_minute)
+
+        async with self._lock:
+            while True:
+                self._refill()
+
+                if self.available_request_capacity >= 1 and self.available_token_capacity >= tokens:
+                    self.available_request_capacity -= 1
+                    self.available_token_capacity -= tokens
+                    return
+
+                # Sleep just long enough for the scarcer bucket to refill
+                request_wait = (1 - self.available_request_capacity) * 60.0 / self.max_requests_per_minute
+                token_wait = (tokens - self.available_token_capacity) * 60.0 / self.max_tokens_per_minute
+                await asyncio.sleep(max(request_wait, token_wait, 0.01))
@@ -3,13 +3,20 @@ AI scoring using DeepSeek API
 """
 
 import asyncio
-import json
 import os
-from typing import List, Optional
+from typing import TYPE_CHECKING, Dict, List, Optional
 
+import httpx
+import json_repair
+import orjson
+from blake3 import blake3
 from openai import AsyncOpenAI
 
 from crawler.base import CrawledItem
+from .rate_limiter import RateLimiter
+
+if TYPE_CHECKING:
+    from storage.cache import Cache
 
 
 SCORING_SYSTEM_PROMPT = """你是一个财经新闻评估专家。你的任务是对新闻内容进行评估和打分。
@@ -41,6 +48,22 @@ SCORING_USER_TEMPLATE = """请评估以下新闻内容：
 
 只返回 JSON 格式的评分结果。"""
 
+SCORING_BATCH_SYSTEM_PROMPT = SCORING_SYSTEM_PROMPT + """
+如果一次给出多条新闻，请按编号顺序返回一个 JSON 数组，数组中每个元素都是上述格式的评分对象，
+并额外包含 "index" 字段，值为该条新闻的编号（整数）。
+元素个数必须与新闻条数一致，每个编号恰好出现一次，不要有任何其他文字。
+"""
+
+SCORING_BATCH_USER_TEMPLATE = """请为以下 {count} 条新闻依次返回 JSON 数组（每条一个评分对象，"index" 字段填写对应编号）：
+
+{entries}
+
+只返回 JSON 数组格式的评分结果。"""
+
+SCORING_BATCH_ENTRY_TEMPLATE = """[{index}] 标题：{title}
+来源：{source}
+内容摘要：{content}"""
+
 
 class AIScorer:
     """AI-based content scorer using DeepSeek API"""
@@ -51,8 +74,10 @@ class AIScorer:
         "deepseek-reasoner": {"input": 0.55, "output": 2.19},
     }
 
-    def __init__(self, config: dict):
+    def __init__(self, config: dict, cache: Optional["Cache"] = None):
         self.config = config
+        # Optional store for reusing scores of identical content
+        self.cache = cache
         self.dimensions = config.get("scoring", {}).get("dimensions", [
             {"name": "relevance", "weight": 0.3},
             {"name": "value", "weight": 0.25},
@@ -65,102 +90,307 @@ class AIScorer:
         if not api_key:
             raise ValueError("DEEPSEEK_API_KEY environment variable is required")
 
+        # Pooled HTTP/2 connections sized for concurrent scoring requests
+        self._http = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+            timeout=httpx.Timeout(60.0, connect=10.0)
+        )
         self.client = AsyncOpenAI(
             api_key=api_key,
-            base_url="https://api.deepseek.com/v1"
+            base_url="https://api.deepseek.com/v1",
+            http_client=self._http
         )
         self.model = config.get("model", "deepseek-chat")
         self.max_tokens = config.get("max_tokens", 4000)
 
+        # Proactive throttling shared by all in-flight requests
+        self.rate_limiter = RateLimiter(
+            rpm=config.get("rpm", 60),
+            tpm=config.get("tpm", 200000)
+        )
+        self._semaphore = asyncio.Semaphore(config.get("max_concurrency", 5))
+        # Content hash -> result future for scores currently being computed
+        self._inflight: Dict[str, asyncio.Future] = {}
+
         # Token usage tracking
         self.usage_stats = {
             "total_input_tokens": 0,
             "total_output_tokens": 0,
-            "total_cost_usd": 0.0
+            "total_cost_usd": 0.0,
+            "cache_hits": 0
         }
 
-    async def score_item(self, item: CrawledItem) -> Optional[dict]:
-        """Score a single item"""
+    async def aclose(self):
+        """Close the underlying HTTP client"""
+        await self._http.aclose()
+
+    def _track_usage(self, response) -> None:
+        """Accumulate token usage and cost from an API response"""
+        if not response.usage:
+            return
+
+        input_tokens = response.usage.prompt_tokens or 0
+        output_tokens = response.usage.completion_tokens or 0
+        self.usage_stats["total_input_tokens"] += input_tokens
+        self.usage_stats["total_output_tokens"] += output_tokens
+
+        # Calculate cost
+        pricing = self.PRICING.get(self.model, self.PRICING["deepseek-chat"])
+        cost = (input_tokens * pricing["input"] + output_tokens * pricing["output"]) / 1_000_000
+        self.usage_stats["total_cost_usd"] += cost
+
+    @staticmethod
+    def _parse_json(result_text: str):
+        """Parse a JSON response from the model
+
+        Falls back to json_repair for typical LLM breakage: markdown code
+        blocks, surrounding prose, trailing commas, single quotes or
+        truncated output.
+        """
         try:
-            # Truncate content if too long
-            content = item.content[:1000] if len(item.content) > 1000 else item.content
+            return orjson.loads(result_text)
+        except orjson.JSONDecodeError:
+            return json_repair.loads(result_text)
+
+    def _apply_weights(self, result: dict) -> dict:
+        """Calculate weighted total score"""
+        scores = result.get("scores", {})
+        total = sum(
+            scores.get(d["name"], 0) * d["weight"]
+            for d in self.dimensions
+        )
+        result["total_score"] = round(total, 2)
+        return result
+
+    @staticmethod
+    def _estimate_tokens(content: str, system_prompt: str = SCORING_SYSTEM_PROMPT) -> int:
+        """Rough token estimate for rate limiting"""
+        return len(content) // 2 + len(system_prompt) // 4
+
+    async def _create_completion(self, messages: List[dict], max_tokens: int):
+        """Call the chat completions API under the concurrency and rate limits"""
+        estimated_tokens = self._estimate_tokens(
+            messages[-1]["content"],
+            messages[0]["content"]
+        )
 
-            response = await self.client.chat.completions.create(
+        async with self._semaphore:
+            await self.rate_limiter.acquire(estimated_tokens)
+            return await self.client.chat.completions.create(
                 model=self.model,
+                messages=messages,
+                max_tokens=max_tokens,
+                temperature=0.3
+            )
+
+    @staticmethod
+    def _content_hashes(items: List[CrawledItem]) -> List[str]:
+        """Hashes of the content that determines each item's score"""
+        arrays = CrawledItem.to_arrays(items, ["title", "content"])
+        return [
+            blake3(f"{title}\n{content[:500]}".encode()).hexdigest(length=16)
+            for title, content in zip(arrays["title"], arrays["content"])
+        ]
+
+    @staticmethod
+    def _truncate(content: str) -> str:
+        """Truncate content if too long"""
+        return content[:1000] if len(content) > 1000 else content
+
+    async def score_item(self, item: CrawledItem) -> Optional[dict]:
+        """Score a single item"""
+        try:
+            response = await self._create_completion(
                 messages=[
                     {"role": "system", "content": SCORING_SYSTEM_PROMPT},
                     {"role": "user", "content": SCORING_USER_TEMPLATE.format(
                         title=item.title,
                         source=item.source_name,
-                        content=content
+                        content=self._truncate(item.content)
                     )}
                 ],
-                max_tokens=500,
-                temperature=0.3
+                max_tokens=500
             )
 
-            # Track token usage
-            if response.usage:
-                input_tokens = response.usage.prompt_tokens or 0
-                output_tokens = response.usage.completion_tokens or 0
-                self.usage_stats["total_input_tokens"] += input_tokens
-                self.usage_stats["total_output_tokens"] += output_tokens
-
-                # Calculate cost
-                pricing = self.PRICING.get(self.model, self.PRICING["deepseek-chat"])
-                cost = (input_tokens * pricing["input"] + output_tokens * pricing["output"]) / 1_000_000
-                self.usage_stats["total_cost_usd"] += cost
-
-            result_text = response.choices[0].message.content.strip()
-
-            # Parse JSON result
-            # Handle potential markdown code blocks
-            if result_text.startswith("```"):
-                lines = result_text.split("\n")
-                result_text = "\n".join(lines[1:-1] if lines[-1] == "```" else lines[1:])
-
-            result = json.loads(result_text)
-
-            # Calculate weighted total score
-            scores = result.get("scores", {})
-            total = sum(
-                scores.get(d["name"], 0) * d["weight"]
-                for d in self.dimensions
-            )
-            result["total_score"] = round(total, 2)
+            self._track_usage(response)
+
+            result = self._parse_json(response.choices[0].message.content)
+            if not isinstance(result, dict):
+                raise ValueError("expected a JSON object result")
 
-            return result
+            return self._apply_weights(result)
 
         except Exception as e:
             print(f"Error scoring item '{item.title[:50]}...': {e}")
             return None
 
+    async def score_batch(self, items: List[CrawledItem]) -> List[Optional[dict]]:
+        """Score several items with a single API request
+
+        Results are mapped back to ``items`` by the ``index`` field the model
+        echoes for each entry. If the batched response cannot be used, falls
+        back to scoring each item on its own; items the response has no score
+        object for are re-scored individually.
+        """
+        if len(items) == 1:
+            return [await self.score_item(items[0])]
+
+        entries = "\n\n".join(
+            SCORING_BATCH_ENTRY_TEMPLATE.format(
+                index=i,
+                title=item.title,
+                source=item.source_name,
+                content=self._truncate(item.content)
+            )
+            for i, item in enumerate(items, 1)
+        )
+
+        try:
+            response = await self._create_completion(
+                messages=[
+                    {"role": "system", "content": SCORING_BATCH_SYSTEM_PROMPT},
+                    {"role": "user", "content": SCORING_BATCH_USER_TEMPLATE.format(
+                        count=len(items),
+                        entries=entries
+                    )}
+                ],
+                max_tokens=500 * len(items)
+            )
+
+            self._track_usage(response)
+
+            results = self._parse_json(response.choices[0].message.content)
+            if not isinstance(results, list) or len(results) != len(items):
+                raise ValueError(f"expected a JSON array of {len(items)} results")
+
+            results_by_index = self._map_batch_results(results, len(items))
+
+        except Exception as e:
+            print(f"Error scoring batch of {len(items)} items, falling back to per-item scoring: {e}")
+            return list(await asyncio.gather(*[self.score_item(item) for item in items]))
+
+        # Elements that were not score objects carry no index; re-score those items
+        missing = [i for i in range(1, len(items) + 1) if i not in results_by_index]
+        if missing:
+            print(f"Batch response missing {len(missing)} of {len(items)} results, re-scoring them individually")
+            rescored = await asyncio.gather(*[self.score_item(items[i - 1]) for i in missing])
+            results_by_index.update(zip(missing, rescored))
+
+        return [results_by_index[i] for i in range(1, len(items) + 1)]
+
+    def _map_batch_results(self, results: list, count: int) -> Dict[int, dict]:
+        """Map batched score objects to 1-based item numbers by their ``index`` field
+
+        Raises ValueError on an unknown or repeated index, since the other
+        results can then no longer be trusted to belong to their items.
+        Non-object elements are skipped.
+        """
+        results_by_index = {}
+        for result in results:
+            if not isinstance(result, dict):
+                continue
+
+            index = result.pop("index", None)
+            try:
+                index = int(index)
+            except (TypeError, ValueError):
+                raise ValueError(f"invalid result index: {index!r}")
+            if not 1 <= index <= count:
+                raise ValueError(f"result index out of range: {index}")
+            if index in results_by_index:
+                raise ValueError(f"duplicate result index: {index}")
+
+            results_by_index[index] = self._apply_weights(result)
+
+        return results_by_index
+
     async def batch_score(
         self,
         items: List[CrawledItem],
         min_score: float = 6.0,
-        batch_size: int = 5
+        batch_size: int = 10
     ) -> List[dict]:
-        """Score multiple items with batching"""
+        """Score multiple items, packing ``batch_size`` items into each request
+
+        All batches are scheduled at once; concurrency and request rate are
+        bounded by the shared semaphore and rate limiter. Items whose content
+        was scored before (in the cache or earlier in this call) are not sent
+        to the API again, and content already being scored by a concurrent
+        call is awaited instead of being requested a second time.
+        """
         scored_items = []
 
-        # Process in batches to avoid rate limits
-        for i in range(0, len(items), batch_size):
-            batch = items[i:i + batch_size]
-            tasks = [self.score_item(item) for item in batch]
-            results = await asyncio.gather(*tasks)
-
-            for item, result in zip(batch, results):
-                if result and result.get("total_score", 0) >= min_score:
-                    scored_items.append({
-                        **item.to_dict(),
-                        "score": result["total_score"],
-                        "category": result.get("category", "other"),
-                        "background": result.get("background", ""),
-                        "impact": result.get("impact_summary", ""),
-                        "summary": result.get("summary", ""),
-                        "scores": result.get("scores", {})
-                    })
+        hashes = self._content_hashes(items)
+        distinct_hashes = list(dict.fromkeys(hashes))
+
+        # Join scores other calls are computing right now
+        inflight = {h: self._inflight[h] for h in distinct_hashes if h in self._inflight}
+
+        lookup = [h for h in distinct_hashes if h not in inflight]
+        results_by_hash = self.cache.get_scores(lookup) if self.cache and lookup else {}
+        # Cached totals were weighted with the config of the run that stored them
+        for result in results_by_hash.values():
+            self._apply_weights(result)
+        self.usage_stats["cache_hits"] += sum(
+            1 for h in hashes if h in results_by_hash or h in inflight
+        )
+
+        # Score each distinct uncached content once, claiming it for this call
+        loop = asyncio.get_running_loop()
+        pending = {}
+        for item, content_hash in zip(items, hashes):
+            if content_hash in results_by_hash or content_hash in inflight or content_hash in pending:
+                continue
+            pending[content_hash] = item
+            self._inflight[content_hash] = loop.create_future()
+        pending_hashes = list(pending.keys())
+        pending_items = list(pending.values())
+
+        batches = [
+            (pending_hashes[i:i + batch_size], pending_items[i:i + batch_size])
+            for i in range(0, len(pending_items), batch_size)
+        ]
+
+        new_results = {}
+        try:
+            batch_results = await asyncio.gather(*[self.score_batch(batch) for _, batch in batches])
+
+            for (batch_hashes, _), results in zip(batches, batch_results):
+                for content_hash, result in zip(batch_hashes, results):
+                    if result:
+                        new_results[content_hash] = result
+
+            if self.cache:
+                self.cache.save_scores(new_results)
+        finally:
+            # Release waiters even if scoring failed; they treat None as unscored
+            for content_hash in pending_hashes:
+                future = self._inflight.pop(content_hash)
+                if not future.done():
+                    future.set_result(new_results.get(content_hash))
+        results_by_hash.update(new_results)
+
+        # Shield the shared futures so cancelling this call does not cancel them
+        joined = await asyncio.gather(*[asyncio.shield(f) for f in inflight.values()])
+        results_by_hash.update(
+            (content_hash, result)
+            for content_hash, result in zip(inflight.keys(), joined)
+            if result
+        )
+
+        for item, content_hash in zip(items, hashes):
+            result = results_by_hash.get(content_hash)
+            if result and result.get("total_score", 0) >= min_score:
+                scored_items.append({
+                    **item.to_dict(),
+                    "score": result["total_score"],
+                    "category": result.get("category", "other"),
+                    "background": result.get("background", ""),
+                    "impact": result.get("impact_summary", ""),
+                    "summary": result.get("summary", ""),
+                    "scores": result.get("scores", {})
+                })
 
         return scored_items
 
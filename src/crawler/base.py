@@ -2,10 +2,12 @@
 Base crawler class
 """
 
+import asyncio
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 from datetime import datetime
-from typing import List, Optional
+from operator import attrgetter
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Sequence
 
 
 @dataclass
@@ -34,6 +36,20 @@ class CrawledItem:
             "raw_data": self.raw_data
         }
 
+    @classmethod
+    def to_arrays(
+        cls,
+        items: List["CrawledItem"],
+        names: Optional[Sequence[str]] = None
+    ) -> Dict[str, list]:
+        """Transpose items into parallel per-field lists
+
+        Only the fields in ``names`` are extracted (all fields by default).
+        """
+        if names is None:
+            names = [f.name for f in fields(cls)]
+        return {name: list(map(attrgetter(name), items)) for name in names}
+
 
 class BaseCrawler(ABC):
     """Abstract base class for crawlers"""
@@ -42,9 +58,40 @@ class BaseCrawler(ABC):
         self.sources = sources
 
     @abstractmethod
+    def stream(self) -> AsyncIterator[CrawledItem]:
+        """Yield items from configured sources as each source completes"""
+        pass
+
     async def fetch(self) -> List[CrawledItem]:
         """Fetch items from configured sources"""
-        pass
+        return [item async for item in self.stream()]
+
+    async def _stream_sources(
+        self,
+        fetch_source: Callable[[dict], Awaitable[List[CrawledItem]]],
+        label: Callable[[dict], str]
+    ) -> AsyncIterator[CrawledItem]:
+        """Fetch all sources concurrently, yielding items in completion order
+
+        Errors are logged per source and don't stop the other sources.
+        """
+        tasks = {asyncio.create_task(fetch_source(source)): source for source in self.sources}
+        pending = set(tasks)
+
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    error = task.exception()
+                    if error is not None:
+                        print(f"Error fetching {label(tasks[task])}: {error}")
+                        continue
+                    for item in task.result():
+                        yield item
+        finally:
+            # Stop outstanding fetches if the consumer stops early
+            for task in pending:
+                task.cancel()
 
     def calculate_priority_score(self, priority: int) -> float:
         """Convert priority (1-10) to a score multiplier"""
@@ -3,49 +3,106 @@ RSS crawler implementation
 """
 
 import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Optional
+from typing import TYPE_CHECKING, AsyncIterator, Dict, List, Optional
 
 import feedparser
+import httpx
+from blake3 import blake3
 from dateutil import parser as date_parser
 
 from .base import BaseCrawler, CrawledItem
 
+if TYPE_CHECKING:
+    from storage.cache import Cache
+
 
 class RSSCrawler(BaseCrawler):
     """RSS feed crawler"""
 
-    def __init__(self, sources: List[dict]):
+    def __init__(self, sources: List[dict], cache: Optional["Cache"] = None):
         super().__init__(sources)
 
-    async def fetch(self) -> List[CrawledItem]:
-        """Fetch items from all configured RSS feeds"""
-        all_items = []
-
-        # Fetch all feeds concurrently
-        tasks = [self._fetch_feed(source) for source in self.sources]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-
-        for source, result in zip(self.sources, results):
-            if isinstance(result, Exception):
-                print(f"Error fetching {source['name']}: {result}")
-                continue
-            all_items.extend(result)
-
-        return all_items
+        # Optional store for ETag/Last-Modified so unchanged feeds are skipped
+        self.cache = cache
+        self._pending_feed_meta: Dict[str, dict] = {}
+
+        # Feeds are downloaded concurrently on the event loop...
+        self._http = httpx.AsyncClient(
+            timeout=30.0,
+            http2=True,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            headers={"User-Agent": feedparser.USER_AGENT}
+        )
+        # ...and only parsing is handed off to a bounded thread pool
+        self._parse_pool = ThreadPoolExecutor(
+            max_workers=max(1, min(16, len(sources))),
+            thread_name_prefix="feedparser"
+        )
+
+    def stream(self) -> AsyncIterator[CrawledItem]:
+        """Yield items from all configured RSS feeds as each feed completes"""
+        return self._stream_sources(self._fetch_feed, lambda source: source["name"])
+
+    def save_feed_meta(self):
+        """Persist caching metadata of fetched feeds
+
+        Call once the run has succeeded, so a failed run re-reads the feeds.
+        """
+        if not self.cache:
+            return
+
+        self.cache.put_feed_meta_many(self._pending_feed_meta)
+        self._pending_feed_meta.clear()
+
+    async def aclose(self):
+        """Close the HTTP client and parse pool"""
+        await self._http.aclose()
+        self._parse_pool.shutdown(wait=False)
 
     async def _fetch_feed(self, source: dict) -> List[CrawledItem]:
         """Fetch items from a single RSS feed"""
         items = []
         limit = source.get("limit", 20)
 
+        url = source["url"]
+        meta = self.cache.get_feed_meta(url) if self.cache else None
+
+        # Conditional GET: let the server answer 304 if nothing changed
+        headers = {}
+        if meta:
+            if meta["etag"]:
+                headers["If-None-Match"] = meta["etag"]
+            if meta["last_modified"]:
+                headers["If-Modified-Since"] = meta["last_modified"]
+
         try:
-            # feedparser is synchronous, run in executor
-            loop = asyncio.get_event_loop()
+            response = await self._http.get(url, headers=headers)
+            if response.status_code == 304:
+                return []
+            response.raise_for_status()
+
+            # Some servers ignore conditional headers; compare bodies instead
+            body_hash = blake3(response.content).hexdigest(length=16)
+            if meta and meta["body_hash"] == body_hash:
+                return []
+
+            # feedparser is synchronous, parse the downloaded bytes in the pool.
+            # Content-Location gives it the final URL to resolve relative links against
+            loop = asyncio.get_running_loop()
             feed = await loop.run_in_executor(
-                None,
-                feedparser.parse,
-                source["url"]
+                self._parse_pool,
+                functools.partial(
+                    feedparser.parse,
+                    response.content,
+                    response_headers={
+                        **response.headers,
+                        "content-location": str(response.url)
+                    }
+                )
             )
 
             if feed.bozo and not feed.entries:
@@ -56,6 +113,12 @@ class RSSCrawler(BaseCrawler):
                 if item:
                     items.append(item)
 
+            self._pending_feed_meta[url] = {
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "body_hash": body_hash
+            }
+
         except Exception as e:
             raise e
 
@@ -63,38 +126,42 @@ class RSSCrawler(BaseCrawler):
 
     def _parse_entry(self, entry: dict, source: dict) -> Optional[CrawledItem]:
         """Parse a feed entry into CrawledItem"""
-        title = entry.get("title", "")
+        # Bind once; FeedParserDict lookups are heavier than plain dict access
+        get = entry.get
+
+        title = get("title", "")
         if not title:
             return None
 
         # Get content
-        content = ""
-        if "content" in entry:
-            content = entry.content[0].get("value", "")
-        elif "summary" in entry:
-            content = entry.summary
-        elif "description" in entry:
-            content = entry.description
+        content_list = get("content")
+        content = (
+            (content_list[0].get("value") if content_list else None)
+            or get("summary")
+            or get("description", "")
+        )
 
         # Parse publish date
         published_at = None
-        if "published_parsed" in entry and entry.published_parsed:
-            published_at = datetime(*entry.published_parsed[:6])
-        elif "published" in entry:
-            try:
-                published_at = date_parser.parse(entry.published)
-            except:
-                pass
-        elif "updated" in entry:
-            try:
-                published_at = date_parser.parse(entry.updated)
-            except:
-                pass
+        published_parsed = get("published_parsed")
+        if published_parsed:
+            published_at = datetime(*published_parsed[:6])
+        else:
+            for date_str in (get("published"), get("updated")):
+                if not date_str:
+                    continue
+                try:
+                    published_at = date_parser.parse(date_str)
+                    break
+                except (ValueError, OverflowError):
+                    continue
 
         # Get URL
-        url = entry.get("link", "")
-        if not url and "links" in entry:
-            url = entry.links[0].get("href", "")
+        url = get("link", "")
+        if not url:
+            links = get("links")
+            if links:
+                url = links[0].get("href", "")
 
         return CrawledItem(
             title=title.strip(),
@@ -103,10 +170,10 @@ class RSSCrawler(BaseCrawler):
             source_name=source["name"],
             source_type="rss",
             published_at=published_at,
-            author=entry.get("author"),
+            author=get("author"),
             priority=source.get("priority", 5),
             raw_data={
-                "tags": [tag.term for tag in entry.get("tags", [])],
+                "tags": [tag.term for tag in get("tags", [])],
                 "link": url
             }
         )
\ No newline at end of file
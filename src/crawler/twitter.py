@@ -3,11 +3,20 @@ Twitter crawler implementation using yt-dlp
 """
 
 import asyncio
-import json
 import os
 import re
 from datetime import datetime
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional
+
+import orjson
+
+try:
+    from yt_dlp import YoutubeDL
+    from yt_dlp.utils import DownloadError
+except ImportError:
+    # Fall back to the yt-dlp CLI if the Python package isn't importable
+    YoutubeDL = None
+    DownloadError = Exception
 
 from .base import BaseCrawler, CrawledItem
 
@@ -15,29 +24,97 @@ from .base import BaseCrawler, CrawledItem
 class TwitterCrawler(BaseCrawler):
     """Twitter crawler using yt-dlp"""
 
-    def __init__(self, sources: List[dict]):
+    # Max bytes per yt-dlp JSON line (asyncio's default of 64 KiB is too small)
+    STREAM_LINE_LIMIT = 16 * 1024 * 1024
+
+    def __init__(self, sources: List[dict], max_concurrency: int = 3):
         super().__init__(sources)
         self.cookies_path = os.getenv("TWITTER_COOKIES_PATH")
+        # Keep this low to avoid Twitter throttling
+        self.max_concurrency = max_concurrency
+
+        # Shared yt-dlp options (playlist limit is set per account)
+        self.ydl_opts = {
+            "extract_flat": "in_playlist",
+            "skip_download": True,
+            "quiet": True,
+            "no_warnings": True,
+        }
+        if self.cookies_path:
+            self.ydl_opts["cookiefile"] = self.cookies_path
 
-    async def fetch(self) -> List[CrawledItem]:
-        """Fetch tweets from configured accounts"""
-        all_items = []
+    def stream(self) -> AsyncIterator[CrawledItem]:
+        """Yield tweets from configured accounts as each account completes"""
+        # Fetch accounts concurrently, a few at a time
+        semaphore = asyncio.Semaphore(self.max_concurrency)
 
-        for source in self.sources:
-            try:
-                items = await self._fetch_account(source)
-                all_items.extend(items)
-            except Exception as e:
-                print(f"Error fetching @{source['account']}: {e}")
-                continue
+        async def run(source: dict) -> List[CrawledItem]:
+            async with semaphore:
+                return await self._fetch_account(source)
+
+        return self._stream_sources(run, lambda source: f"@{source['account']}")
 
-        return all_items
+    @staticmethod
+    def _compile_keywords(keywords: List[str]) -> Optional[re.Pattern]:
+        """Compile an account's keywords into a single matcher"""
+        if not keywords:
+            return None
+        return re.compile("|".join(re.escape(kw.lower()) for kw in keywords))
+
+    @staticmethod
+    def _matches_keywords(item: CrawledItem, keyword_re: Optional[re.Pattern]) -> bool:
+        """Check whether a tweet matches the account's keyword filter"""
+        if keyword_re is None:
+            return True
+        text = f"{item.title} {item.content}".lower()
+        return keyword_re.search(text) is not None
+
+    @staticmethod
+    def _is_login_error(error_msg: str) -> bool:
+        """Check if it's a login-required error (common for Twitter)"""
+        error_msg = error_msg.lower()
+        return "sign in" in error_msg or "login" in error_msg
 
     async def _fetch_account(self, source: dict) -> List[CrawledItem]:
         """Fetch tweets from a single Twitter account"""
+        if YoutubeDL is None:
+            return await self._fetch_account_subprocess(source)
+
+        account = source["account"]
+        limit = source.get("limit", 10)
+        keyword_re = self._compile_keywords(source.get("keywords", []))
+        url = f"https://x.com/{account}"
+
+        opts = {**self.ydl_opts, "playlistend": limit}
+
+        def extract() -> dict:
+            # YoutubeDL instances aren't thread-safe, use one per call
+            with YoutubeDL(opts) as ydl:
+                return ydl.extract_info(url, download=False)
+
+        try:
+            # yt-dlp is synchronous, run in executor
+            loop = asyncio.get_running_loop()
+            info = await loop.run_in_executor(None, extract)
+        except DownloadError as e:
+            if self._is_login_error(str(e)):
+                print(f"Twitter requires login for @{account}, skipping...")
+                return []
+            raise Exception(f"yt-dlp error: {e}")
+
+        items = []
+        for data in (info or {}).get("entries") or []:
+            item = self._parse_tweet(data, source)
+            if item and self._matches_keywords(item, keyword_re):
+                items.append(item)
+
+        return items[:limit]
+
+    async def _fetch_account_subprocess(self, source: dict) -> List[CrawledItem]:
+        """Fetch tweets from a single Twitter account via the yt-dlp CLI"""
         account = source["account"]
         limit = source.get("limit", 10)
-        keywords = source.get("keywords", [])
+        keyword_re = self._compile_keywords(source.get("keywords", []))
 
         # Build yt-dlp command
         url = f"https://x.com/{account}"
@@ -64,40 +141,43 @@ class TwitterCrawler(BaseCrawler):
             process = await asyncio.create_subprocess_exec(
                 *cmd,
                 stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
+                stderr=asyncio.subprocess.PIPE,
+                limit=self.STREAM_LINE_LIMIT
             )
 
-            stdout, stderr = await process.communicate()
-
-            if process.returncode != 0:
-                error_msg = stderr.decode() if stderr else "Unknown error"
-                # Check if it's a login-required error (common for Twitter)
-                if "sign in" in error_msg.lower() or "login" in error_msg.lower():
-                    print(f"Twitter requires login for @{account}, skipping...")
-                    return []
-                raise Exception(f"yt-dlp error: {error_msg}")
+            # Drain stderr concurrently so a full pipe can't block yt-dlp
+            stderr_task = asyncio.create_task(process.stderr.read())
 
             items = []
-            lines = stdout.decode().strip().split("\n")
+            try:
+                # Parse tweets as yt-dlp emits them
+                async for line in process.stdout:
+                    if not line.strip():
+                        continue
 
-            for line in lines:
-                if not line.strip():
-                    continue
+                    try:
+                        data = orjson.loads(line)
+                    except orjson.JSONDecodeError:
+                        continue
 
-                try:
-                    data = json.loads(line)
                     item = self._parse_tweet(data, source)
+                    if item and self._matches_keywords(item, keyword_re):
+                        items.append(item)
 
-                    # Apply keyword filter if configured
-                    if keywords and item:
-                        text = f"{item.title} {item.content}".lower()
-                        if not any(kw.lower() in text for kw in keywords):
-                            continue
+                await process.wait()
+                stderr = await stderr_task
+            finally:
+                if process.returncode is None:
+                    process.kill()
+                    await process.wait()
+                    stderr_task.cancel()
 
-                    if item:
-                        items.append(item)
-                except json.JSONDecodeError:
-                    continue
+            if process.returncode != 0:
+                error_msg = stderr.decode() if stderr else "Unknown error"
+                if self._is_login_error(error_msg):
+                    print(f"Twitter requires login for @{account}, skipping...")
+                    return []
+                raise Exception(f"yt-dlp error: {error_msg}")
 
             return items[:limit]
 
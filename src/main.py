@@ -3,12 +3,15 @@ Main entry point for crawler report system
 """
 
 import asyncio
+import heapq
 import os
 from datetime import datetime
 from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 
 import yaml
 
+from crawler.base import BaseCrawler, CrawledItem
 from crawler.rss import RSSCrawler
 from crawler.twitter import TwitterCrawler
 from storage.cache import Cache
@@ -24,6 +27,91 @@ def load_config():
         return yaml.safe_load(f)
 
 
+# Max crawled items checked against the history in one dedup query
+DEDUP_WINDOW = 50
+
+
+async def run_pipeline(
+    crawlers: Dict[str, BaseCrawler],
+    cache: Cache,
+    scorer: AIScorer,
+    min_score: float,
+    top_n: int,
+    score_workers: int = 5
+) -> Tuple[List[dict], dict]:
+    """Crawl, deduplicate and score items as a streaming pipeline
+
+    Crawled items flow through queues so deduplication and AI scoring start
+    as soon as the first source returns, instead of waiting for all crawls.
+    Returns the top ``top_n`` scored items (highest first) and stage counts.
+    """
+    crawl_queue: asyncio.Queue[Optional[CrawledItem]] = asyncio.Queue()
+    score_queue: asyncio.Queue[Optional[List[CrawledItem]]] = asyncio.Queue()
+
+    stats = {"collected": {name: 0 for name in crawlers}, "unique": 0, "passed": 0}
+
+    # Running top-N min-heap of (score, -sequence, item); earlier items win ties
+    top_heap: List[tuple] = []
+    sequence = 0
+
+    async def crawl(name: str, crawler: BaseCrawler):
+        async for item in crawler.stream():
+            stats["collected"][name] += 1
+            await crawl_queue.put(item)
+
+    async def crawl_all():
+        await asyncio.gather(*(crawl(name, crawler) for name, crawler in crawlers.items()))
+        await crawl_queue.put(None)
+
+    async def dedup_worker():
+        done = False
+        while not done:
+            # Block for one item, then take whatever else is already queued
+            window = []
+            item = await crawl_queue.get()
+            while item is not None:
+                window.append(item)
+                if len(window) >= DEDUP_WINDOW or crawl_queue.empty():
+                    break
+                item = crawl_queue.get_nowait()
+            done = item is None
+
+            unique_items = cache.deduplicate(window) if window else []
+            if unique_items:
+                stats["unique"] += len(unique_items)
+                await score_queue.put(unique_items)
+
+        for _ in range(score_workers):
+            await score_queue.put(None)
+
+    async def score_worker():
+        nonlocal sequence
+        while (window := await score_queue.get()) is not None:
+            for scored in await scorer.batch_score(window, min_score):
+                stats["passed"] += 1
+                sequence += 1
+                entry = (scored["score"], -sequence, scored)
+                if len(top_heap) < top_n:
+                    heapq.heappush(top_heap, entry)
+                else:
+                    heapq.heappushpop(top_heap, entry)
+
+    tasks = [
+        asyncio.create_task(crawl_all()),
+        asyncio.create_task(dedup_worker()),
+        *(asyncio.create_task(score_worker()) for _ in range(score_workers))
+    ]
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+
+    top_items = [entry[2] for entry in sorted(top_heap, reverse=True)]
+    return top_items, stats
+
+
 async def main():
     """Main execution flow"""
     print(f"[{datetime.now().isoformat()}] Starting crawler report...")
@@ -35,98 +123,112 @@ async def main():
 
     # Initialize components
     cache = Cache()
-    scorer = AIScorer(config.get("ai", {}))
+    scorer = AIScorer(config.get("ai", {}), cache=cache)
     generator = ReportGenerator()
     client = WorkerClient()
 
-    items = []
-
-    # 1. Crawl RSS feeds
-    rss_sources = sources_config.get("rss", [])
-    if rss_sources:
-        print("[1/7] Crawling RSS feeds...")
-        rss_crawler = RSSCrawler(rss_sources)
-        rss_items = await rss_crawler.fetch()
-        items.extend(rss_items)
-        print(f"    Collected {len(rss_items)} items from RSS")
-
-    # 2. Crawl Twitter
-    twitter_sources = sources_config.get("twitter", [])
-    if twitter_sources:
-        print("[2/7] Crawling Twitter...")
-        twitter_crawler = TwitterCrawler(twitter_sources)
-        twitter_items = await twitter_crawler.fetch()
-        items.extend(twitter_items)
-        print(f"    Collected {len(twitter_items)} items from Twitter")
-
-    if not items:
-        print("No items collected, exiting.")
-        return
-
-    # 3. Deduplicate
-    print("[3/7] Deduplicating...")
-    items = cache.deduplicate(items)
-    print(f"    {len(items)} unique items after dedup")
-
-    if not items:
-        print("No items to process, exiting.")
-        return
-
-    # 4. AI scoring
-    print("[4/7] AI scoring...")
-    scored_items = await scorer.batch_score(items, report_config.get("min_score", 6))
-    print(f"    {len(scored_items)} items passed scoring threshold")
-
-    if not scored_items:
-        print("No items passed scoring, exiting.")
-        return
-
-    # 5. Select top N
-    top_n = report_config.get("top_n", 5)
-    top_items = sorted(scored_items, key=lambda x: x["score"], reverse=True)[:top_n]
-    print(f"[5/7] Selected top {len(top_items)} items")
-
-    # 6. Generate report
-    print("[6/7] Generating report...")
-    all_source_names = (
-        [s["name"] for s in rss_sources] +
-        [f"@{s['account']}" for s in twitter_sources]
-    )
-    ai_stats = scorer.get_usage_stats()
-    report = generator.generate(
-        items=top_items,
-        report_name=report_config.get("name", "财经要闻日报"),
-        sources=all_source_names,
-        ai_stats=ai_stats
-    )
-
-    # 7. Publish
-    print("[7/7] Publishing...")
-    today = datetime.now().strftime("%Y-%m-%d")
-    result = await client.publish(
-        title=f"{report_config.get('name', '财经要闻日报')} - {today}",
-        date=today,
-        content=report,
-        push=True
-    )
-
-    if result.get("success"):
-        print(f"    Report published: {result.get('url')}")
-        if result.get("push"):
-            print(f"    Push notifications: sent={result['push'].get('sent')}, failed={result['push'].get('failed')}")
-    else:
-        error_msg = result.get('error')
-        print(f"    Failed to publish: {error_msg}")
-        if result.get('details'):
-            print(f"    Details: {result.get('details')}")
-        # Exit with error so GitHub Actions can detect failure
-        import sys
-        sys.exit(1)
-
-    # Update cache
-    cache.save_history(top_items)
-
-    print(f"[{datetime.now().isoformat()}] Done!")
+    try:
+        crawlers: Dict[str, BaseCrawler] = {}
+        rss_crawler = None
+
+        rss_sources = sources_config.get("rss", [])
+        if rss_sources:
+            rss_crawler = RSSCrawler(rss_sources, cache=cache)
+            crawlers["RSS"] = rss_crawler
+
+        twitter_sources = sources_config.get("twitter", [])
+        if twitter_sources:
+            crawlers["Twitter"] = TwitterCrawler(
+                twitter_sources,
+                max_concurrency=config.get("crawler", {}).get("twitter_concurrency", 3)
+            )
+
+        # 1. Crawl, deduplicate and AI score, overlapped as a pipeline
+        print("[1/4] Crawling, deduplicating and AI scoring...")
+        try:
+            top_items, stats = await run_pipeline(
+                crawlers,
+                cache,
+                scorer,
+                min_score=report_config.get("min_score", 6),
+                top_n=report_config.get("top_n", 5),
+                score_workers=config.get("ai", {}).get("max_concurrency", 5)
+            )
+        finally:
+            if rss_crawler:
+                await rss_crawler.aclose()
+
+        for name, count in stats["collected"].items():
+            print(f"    Collected {count} items from {name}")
+
+        if not sum(stats["collected"].values()):
+            print("No items collected, exiting.")
+            return
+
+        print(f"    {stats['unique']} unique items after dedup")
+
+        if not stats["unique"]:
+            print("No items to process, exiting.")
+            return
+
+        print(f"    {stats['passed']} items passed scoring threshold")
+
+        if not top_items:
+            print("No items passed scoring, exiting.")
+            return
+
+        # 2. Select top N
+        print(f"[2/4] Selected top {len(top_items)} items")
+
+        # 3. Generate report
+        print("[3/4] Generating report...")
+        all_source_names = (
+            [s["name"] for s in rss_sources] +
+            [f"@{s['account']}" for s in twitter_sources]
+        )
+        ai_stats = scorer.get_usage_stats()
+        report = generator.generate(
+            items=top_items,
+            report_name=report_config.get("name", "财经要闻日报"),
+            sources=all_source_names,
+            ai_stats=ai_stats
+        )
+
+        # 4. Publish
+        print("[4/4] Publishing...")
+        today = datetime.now().strftime("%Y-%m-%d")
+        result = await client.publish(
+            title=f"{report_config.get('name', '财经要闻日报')} - {today}",
+            date=today,
+            content=report,
+            push=True
+        )
+
+        if result.get("success"):
+            print(f"    Report published: {result.get('url')}")
+            if result.get("push"):
+                print(f"    Push notifications: sent={result['push'].get('sent')}, failed={result['push'].get('failed')}")
+        else:
+            error_msg = result.get('error')
+            print(f"    Failed to publish: {error_msg}")
+            if result.get('details'):
+                print(f"    Details: {result.get('details')}")
+            # Exit with error so GitHub Actions can detect failure
+            import sys
+            sys.exit(1)
+
+        # Update cache
+        cache.save_history(top_items)
+        cache.expire_scores()
+        if rss_crawler:
+            rss_crawler.save_feed_meta()
+
+        print(f"[{datetime.now().isoformat()}] Done!")
+
+    finally:
+        await client.aclose()
+        await scorer.aclose()
+        cache.close()
 
 
 if __name__ == "__main__":
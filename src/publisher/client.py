@@ -6,6 +6,7 @@ import os
 from typing import Optional
 
 import httpx
+import orjson
 
 
 class WorkerClient:
@@ -20,6 +21,17 @@ class WorkerClient:
         if not self.push_token:
             raise ValueError("PUSH_TOKEN environment variable is required")
 
+        # Long-lived client so repeated calls reuse pooled connections
+        self._client = httpx.AsyncClient(
+            timeout=30.0,
+            http2=True,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
+        )
+
+    async def aclose(self):
+        """Close the underlying HTTP client"""
+        await self._client.aclose()
+
     async def publish(
         self,
         title: str,
@@ -35,39 +47,37 @@ class WorkerClient:
             "push": push
         }
 
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            try:
-                response = await client.post(
-                    f"{self.worker_url}/publish",
-                    json=payload,
-                    headers={
-                        "Content-Type": "application/json",
-                        "Authorization": f"Bearer {self.push_token}"
-                    }
-                )
-
-                result = response.json()
+        try:
+            response = await self._client.post(
+                f"{self.worker_url}/publish",
+                content=orjson.dumps(payload),
+                headers={
+                    "Content-Type": "application/json",
+                    "Authorization": f"Bearer {self.push_token}"
+                }
+            )
 
-                if response.status_code == 200:
-                    return result
-                else:
-                    return {
-                        "success": False,
-                        "error": result.get("error", f"HTTP {response.status_code}"),
-                        "details": result.get("details")
-                    }
+            result = orjson.loads(response.content)
 
-            except httpx.RequestError as e:
+            if response.status_code == 200:
+                return result
+            else:
                 return {
                     "success": False,
-                    "error": f"Request failed: {str(e)}"
+                    "error": result.get("error", f"HTTP {response.status_code}"),
+                    "details": result.get("details")
                 }
 
+        except httpx.RequestError as e:
+            return {
+                "success": False,
+                "error": f"Request failed: {str(e)}"
+            }
+
     async def health_check(self) -> dict:
         """Check Worker health status"""
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            try:
-                response = await client.get(f"{self.worker_url}/health")
-                return response.json()
-            except Exception as e:
-                return {"status": "error", "message": str(e)}
\ No newline at end of file
+        try:
+            response = await self._client.get(f"{self.worker_url}/health", timeout=10.0)
+            return orjson.loads(response.content)
+        except Exception as e:
+            return {"status": "error", "message": str(e)}
\ No newline at end of file
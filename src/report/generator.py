@@ -17,8 +17,12 @@ class ReportGenerator:
         self.env = Environment(
             loader=FileSystemLoader(template_dir),
             trim_blocks=True,
-            lstrip_blocks=True
+            lstrip_blocks=True,
+            auto_reload=False,
+            cache_size=-1
         )
+        # Compile once; templates don't change while the process runs
+        self._template = self.env.get_template("report.md.j2")
 
     def generate(
         self,
@@ -28,11 +32,9 @@ class ReportGenerator:
         ai_stats: dict = None
     ) -> str:
         """Generate a Markdown report"""
-        template = self.env.get_template("report.md.j2")
-
         now = datetime.now()
 
-        return template.render(
+        return self._template.render(
             report_name=report_name,
             generated_at=now.strftime("%Y-%m-%d %H:%M"),
             generated_date=now.strftime("%Y-%m-%d"),
@@ -2,12 +2,14 @@
 Cache and deduplication using SQLite
 """
 
-import hashlib
 import json
 import sqlite3
+import threading
 from datetime import datetime
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional
+
+from blake3 import blake3
 
 from crawler.base import CrawledItem
 
@@ -15,6 +17,15 @@ from crawler.base import CrawledItem
 class Cache:
     """SQLite-based cache for deduplication and history"""
 
+    # Max bound parameters per IN (...) query, below SQLite's default limit
+    QUERY_CHUNK_SIZE = 500
+
+    # URL hash digest size in bytes (hex string is twice as long)
+    URL_HASH_BYTES = 16
+
+    # Days a cached AI score stays reusable
+    SCORE_TTL_DAYS = 7
+
     def __init__(self, db_path: Optional[str] = None):
         if db_path is None:
             cache_dir = Path(__file__).parent.parent.parent / "cache"
@@ -22,20 +33,37 @@ class Cache:
             db_path = str(cache_dir / "history.db")
 
         self.db_path = db_path
-        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = self._connect()
         self._init_db()
 
+    def _connect(self) -> sqlite3.Connection:
+        """Open a long-lived connection shared by all cache methods
+
+        Autocommit mode: write methods manage their own transactions.
+        """
+        conn = sqlite3.connect(
+            self.db_path,
+            isolation_level=None,
+            check_same_thread=False
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA cache_size=-20000")
+        return conn
+
     def _get_connection(self) -> sqlite3.Connection:
-        """Get or create database connection"""
+        """Get or reopen database connection"""
         if self._conn is None:
-            self._conn = sqlite3.connect(self.db_path)
+            self._conn = self._connect()
         return self._conn
 
     def close(self):
         """Close database connection"""
-        if self._conn:
-            self._conn.close()
-            self._conn = None
+        with self._lock:
+            if self._conn:
+                self._conn.close()
+                self._conn = None
 
     def __enter__(self):
         return self
@@ -48,6 +76,8 @@ class Cache:
         conn = self._get_connection()
         cursor = conn.cursor()
 
+        cursor.execute("BEGIN")
+
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS crawled_items (
                 url_hash TEXT PRIMARY KEY,
@@ -65,70 +95,212 @@ class Cache:
             ON crawled_items(crawled_at)
         """)
 
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS feed_meta (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                body_hash TEXT
+            )
+        """)
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS scored_cache (
+                content_hash TEXT PRIMARY KEY,
+                result_json TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+
+        self._migrate_url_hashes(cursor)
+
         conn.commit()
 
+    def _migrate_url_hashes(self, cursor: sqlite3.Cursor):
+        """Rehash rows stored with an older URL hash (e.g. SHA256)"""
+        cursor.execute(
+            "SELECT url_hash, url FROM crawled_items WHERE length(url_hash) != ?",
+            (self.URL_HASH_BYTES * 2,)
+        )
+        rows = cursor.fetchall()
+        if not rows:
+            return
+
+        cursor.executemany(
+            "UPDATE OR REPLACE crawled_items SET url_hash = ? WHERE url_hash = ?",
+            [(self._hash_url(url), old_hash) for old_hash, url in rows]
+        )
+
     def _hash_url(self, url: str) -> str:
-        """Generate SHA256 hash of URL"""
-        return hashlib.sha256(url.encode()).hexdigest()
+        """Generate BLAKE3 hash of URL"""
+        return blake3(url.encode()).hexdigest(length=self.URL_HASH_BYTES)
 
     def deduplicate(self, items: List[CrawledItem]) -> List[CrawledItem]:
         """Remove items that have been crawled before"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
+        hashes = [self._hash_url(url) for url in CrawledItem.to_arrays(items, ["url"])["url"]]
+
+        # Look up all hashes in bulk, chunked to stay under the parameter limit
+        seen = set()
+        with self._lock:
+            cursor = self._get_connection().cursor()
+            for i in range(0, len(hashes), self.QUERY_CHUNK_SIZE):
+                chunk = hashes[i:i + self.QUERY_CHUNK_SIZE]
+                placeholders = ",".join("?" * len(chunk))
+                cursor.execute(
+                    f"SELECT url_hash FROM crawled_items WHERE url_hash IN ({placeholders})",
+                    chunk
+                )
+                seen.update(row[0] for row in cursor.fetchall())
+
+        return [item for item, url_hash in zip(items, hashes) if url_hash not in seen]
+
+    def save_history(self, items: List[dict], score_key: str = "score"):
+        """Save crawled items to history"""
+        now = datetime.now().isoformat()
 
-        unique_items = []
-        for item in items:
-            url_hash = self._hash_url(item.url)
+        rows = [
+            (
+                self._hash_url(item["url"]),
+                item["url"],
+                item.get("title", ""),
+                item.get("source_name", ""),
+                now,
+                item.get("published_at"),
+                item.get(score_key)
+            )
+            for item in items
+            if item.get("url")
+        ]
+
+        # Single write transaction for the whole batch
+        with self._lock:
+            conn = self._get_connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany("""
+                    INSERT OR REPLACE INTO crawled_items
+                    (url_hash, url, title, source_name, crawled_at, published_at, score)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                """, rows)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
 
+    def get_feed_meta(self, url: str) -> Optional[dict]:
+        """Get stored HTTP caching metadata for a feed"""
+        with self._lock:
+            cursor = self._get_connection().cursor()
             cursor.execute(
-                "SELECT 1 FROM crawled_items WHERE url_hash = ?",
-                (url_hash,)
+                "SELECT etag, last_modified, body_hash FROM feed_meta WHERE url = ?",
+                (url,)
             )
+            row = cursor.fetchone()
 
-            if cursor.fetchone() is None:
-                unique_items.append(item)
+        if row is None:
+            return None
 
-        return unique_items
+        return {"etag": row[0], "last_modified": row[1], "body_hash": row[2]}
 
-    def save_history(self, items: List[dict], score_key: str = "score"):
-        """Save crawled items to history"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
+    def put_feed_meta(
+        self,
+        url: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        body_hash: Optional[str] = None
+    ):
+        """Store HTTP caching metadata for a feed"""
+        with self._lock:
+            self._get_connection().execute("""
+                INSERT OR REPLACE INTO feed_meta (url, etag, last_modified, body_hash)
+                VALUES (?, ?, ?, ?)
+            """, (url, etag, last_modified, body_hash))
+
+    def put_feed_meta_many(self, metas: Dict[str, dict]):
+        """Store HTTP caching metadata for several feeds in one transaction"""
+        rows = [
+            (url, meta.get("etag"), meta.get("last_modified"), meta.get("body_hash"))
+            for url, meta in metas.items()
+        ]
+        if not rows:
+            return
+
+        with self._lock:
+            conn = self._get_connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany("""
+                    INSERT OR REPLACE INTO feed_meta (url, etag, last_modified, body_hash)
+                    VALUES (?, ?, ?, ?)
+                """, rows)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+    def get_scores(self, content_hashes: List[str], max_age_days: int = SCORE_TTL_DAYS) -> Dict[str, dict]:
+        """Get cached AI scoring results by content hash, ignoring stale ones"""
+        results = {}
+        with self._lock:
+            cursor = self._get_connection().cursor()
+            for i in range(0, len(content_hashes), self.QUERY_CHUNK_SIZE):
+                chunk = content_hashes[i:i + self.QUERY_CHUNK_SIZE]
+                placeholders = ",".join("?" * len(chunk))
+                cursor.execute(
+                    f"""
+                    SELECT content_hash, result_json FROM scored_cache
+                    WHERE content_hash IN ({placeholders})
+                    AND created_at >= datetime('now', ?)
+                    """,
+                    [*chunk, f"-{max_age_days} days"]
+                )
+                for content_hash, result_json in cursor.fetchall():
+                    results[content_hash] = json.loads(result_json)
 
-        for item in items:
-            url = item.get("url", "")
-            if not url:
-                continue
+        return results
 
-            url_hash = self._hash_url(url)
+    def save_scores(self, results: Dict[str, dict]):
+        """Cache AI scoring results by content hash"""
+        rows = [
+            (content_hash, json.dumps(result, ensure_ascii=False))
+            for content_hash, result in results.items()
+        ]
+        if not rows:
+            return
 
+        with self._lock:
+            conn = self._get_connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany("""
+                    INSERT OR REPLACE INTO scored_cache (content_hash, result_json)
+                    VALUES (?, ?)
+                """, rows)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+    def expire_scores(self, days: int = SCORE_TTL_DAYS) -> int:
+        """Remove cached AI scoring results older than specified days"""
+        with self._lock:
+            cursor = self._get_connection().cursor()
             cursor.execute("""
-                INSERT OR REPLACE INTO crawled_items
-                (url_hash, url, title, source_name, crawled_at, published_at, score)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, (
-                url_hash,
-                url,
-                item.get("title", ""),
-                item.get("source_name", ""),
-                datetime.now().isoformat(),
-                item.get("published_at"),
-                item.get(score_key)
-            ))
+                DELETE FROM scored_cache
+                WHERE created_at < datetime('now', ?)
+            """, (f"-{days} days",))
 
-        conn.commit()
+            return cursor.rowcount
 
     def cleanup_old_items(self, days: int = 30):
         """Remove items older than specified days"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-
-        cursor.execute("""
-            DELETE FROM crawled_items
-            WHERE crawled_at < datetime('now', ?)
-        """, (f"-{days} days",))
+        with self._lock:
+            cursor = self._get_connection().cursor()
 
-        deleted = cursor.rowcount
-        conn.commit()
+            cursor.execute("""
+                DELETE FROM crawled_items
+                WHERE crawled_at < datetime('now', ?)
+            """, (f"-{days} days",))
+            deleted = cursor.rowcount
 
-        return deleted
\ No newline at end of file
+            return deleted
\ No newline at end of file